@@ -2,13 +2,13 @@
 
 import uuid
 from datetime import datetime
+from functools import lru_cache
 import langchain_core
 
 from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
 from langgraph_swarm import create_handoff_tool, create_swarm
 from typing import Dict, Any, List, Optional, Tuple
-import json
 from langsmith import traceable
 
 # Fix langchain globals issue
@@ -29,11 +29,10 @@ if not hasattr(langchain, 'llm_cache'):
 
 
 from .prompts import create_logger_prompt, create_coach_prompt, orchestration_prompt
-from .utils import print_stream
 from services.mcp_client import create_mcp_client
 from services.langchain_memory_service import langchain_memory_service
 from models.memory import MemoryConfiguration
-from config.settings import settings, get_configuration
+from config.settings import get_configuration
 
 
 def format_user_message_with_context(user_id: str, message: str) -> str:
@@ -45,28 +44,32 @@ def format_user_message_with_context(user_id: str, message: str) -> str:
 # Initialize LLM based on configuration
 config = get_configuration()
 
+@lru_cache(maxsize=8)
+def _create_chat_model(model: str, api_key: str, base_url: Optional[str] = None) -> ChatOpenAI:
+    """Create a chat model; agents with the same LLM settings share one instance."""
+    return ChatOpenAI(
+        model=model,
+        base_url=base_url,
+        api_key=api_key,
+        temperature=0.7,
+        verbose=False,
+        streaming=False
+    )
+
+
 def get_model():
     """Get the LLM model with lazy initialization to avoid import-time errors."""
     config = get_configuration()
     
     if config.llm_provider == "openai":
         # Use OpenAI API
-        return ChatOpenAI(
-            model=config.openai_model,
-            api_key=config.openai_api_key,
-            temperature=0.7,
-            verbose=False,
-            streaming=False
-        )
+        return _create_chat_model(config.openai_model, config.openai_api_key)
     else:
         # Use local LLM (vLLM, Ollama, etc.) with OpenAI-compatible interface
-        return ChatOpenAI(
-            model=config.local_llm_model,
-            base_url=config.local_llm_base_url,
-            api_key=config.local_llm_api_key or "dummy-key",
-            temperature=0.7,
-            verbose=False,
-            streaming=False
+        return _create_chat_model(
+            config.local_llm_model,
+            config.local_llm_api_key or "dummy-key",
+            config.local_llm_base_url
         )
 
 def get_openai_client():
@@ -6,8 +6,12 @@ import asyncio
 import time
 from typing import Dict, Any, List, Optional, AsyncGenerator
 from config.settings import settings
+from services.mcp_client import format_tool_content
 
 
+# Delay between streamed words for smooth client-side rendering
+STREAM_WORD_DELAY = 0.05
+
 # HTTP client for MCP server communication
 httpx_client = httpx.AsyncClient(
     timeout=httpx.Timeout(30.0),
@@ -90,7 +94,7 @@ async def execute_mcp_tool(tool_name: str, tool_args: Dict[str, Any]) -> str:
             result = response.json()
             if result.get("result"):
                 content = result.get("result", {}).get("content", "")
-                return content if isinstance(content, str) else json.dumps(content)
+                return format_tool_content(content)
             else:
                 error_msg = result.get("error", {}).get("message", "Unknown error")
                 return f"Tool execution failed: {error_msg}"
@@ -244,7 +248,7 @@ async def structured_agent_stream(
                                         }
                                     }
                                     yield f"data: {json.dumps(word_chunk, ensure_ascii=False)}\n\n"
-                                    await asyncio.sleep(0.05)  # Smooth word-by-word streaming
+                                    await asyncio.sleep(STREAM_WORD_DELAY)  # Smooth word-by-word streaming
                         
                         # Handle tool calls
                         if hasattr(last_message, 'tool_calls') and last_message.tool_calls:
@@ -111,7 +111,7 @@ class Configuration(BaseModel):
         description="Enable compression for memory storage" 
     )
     memory_storage_backend: str = Field(
-        default="memory",
+        default="file",
         title="Memory Storage Backend",
         description="Backend for storing conversation history: memory, file, database"
     )
@@ -168,7 +168,7 @@ class Settings(BaseSettings):
     memory_cleanup_interval_hours: int = 24
     memory_max_conversation_age_days: int = 30
     memory_enable_compression: bool = True
-    memory_storage_backend: str = "memory"  # "memory", "file", "database"
+    memory_storage_backend: str = "file"  # "memory", "file", "database"
     memory_type: str = "buffer_window"  # "buffer", "buffer_window", "summary_buffer", "entity"
     
     class Config:
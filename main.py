@@ -5,17 +5,29 @@ from models.memory import MemorySearchQuery
 from agents.agent import agent_system
 from services.langchain_memory_service import langchain_memory_service
 from config.settings import get_configuration
+from services.mcp_client import create_mcp_client, get_shared_http_client, close_shared_http_client
+from contextlib import asynccontextmanager
 import json
 import time
 import asyncio
 import uuid
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the pooled MCP HTTP client on startup and close it on shutdown."""
+    get_shared_http_client()
+    yield
+    await close_shared_http_client()
+
+
 app = FastAPI(
     title="Pili Exercise Chatbot API",
     description="A multiagent chatbot named Pili for tracking exercises using LangGraph and FastAPI.",
     version="1.0.0",
     openapi_url="/api/openapi.json",
-    docs_url="/api/docs"
+    docs_url="/api/docs",
+    lifespan=lifespan
 )
 
 api_router = APIRouter(prefix="/api")
@@ -216,6 +228,8 @@ async def search_memory(query: MemorySearchQuery):
             "results_count": len(results),
             "results": results
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -243,6 +257,8 @@ async def get_conversation_history(
         )
         
         return conversation_data
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -272,7 +288,6 @@ async def health_check_detailed():
         config = get_configuration()
         
         # Test MCP connection
-        from services.mcp_client import create_mcp_client
         mcp_client = create_mcp_client()
         try:
             mcp_status = await mcp_client.test_connection()
@@ -333,8 +348,6 @@ async def test_config():
 async def debug_mcp():
     """Debug endpoint to test MCP client and tool schemas."""
     try:
-        from services.mcp_client import create_mcp_client
-        
         mcp_client = create_mcp_client()
         try:
             # Test connection
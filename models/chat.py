@@ -1,11 +1,19 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Dict, Any, Optional
 
 class ChatRequest(BaseModel):
     user_id: str
-    message: str
+    message: str = Field(..., min_length=1)
     session_id: Optional[str] = "default"  # Add session support for memory
     stream: Optional[bool] = False  # Add streaming support
+    
+    @field_validator("message")
+    @classmethod
+    def message_not_blank(cls, value: str) -> str:
+        """Reject whitespace-only messages without altering valid ones."""
+        if value.isspace():
+            raise ValueError("message must not be blank")
+        return value
 
 class ChatResponse(BaseModel):
     response: str
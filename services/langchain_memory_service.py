@@ -1,16 +1,18 @@
 """LangChain-based memory service for conversation history management."""
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from datetime import datetime, timedelta, timezone
 import asyncio
 import json
+import shutil
 from pathlib import Path
 from collections import defaultdict
 import logging
 
 # Using basic LangChain message history without deprecated memory classes
 from langchain_community.chat_message_histories import FileChatMessageHistory
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
+from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage, messages_to_dict
 from langchain_openai import ChatOpenAI
 
 from config.settings import get_configuration
@@ -18,12 +20,26 @@ from models.memory import MemoryConfiguration, MemoryStats
 
 logger = logging.getLogger(__name__)
 
+
+class BulkFileChatMessageHistory(FileChatMessageHistory):
+    """File-backed chat history that persists a batch of messages with a single write."""
+    
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Append all messages to the history file in one read/write cycle."""
+        stored = json.loads(self.file_path.read_text(encoding=self.encoding))
+        stored.extend(messages_to_dict(messages))
+        self.file_path.write_text(
+            json.dumps(stored, ensure_ascii=self.ensure_ascii), encoding=self.encoding
+        )
+
+
 class LangChainMemoryService:
     """Service for managing conversation memory using LangChain's memory capabilities."""
     
     def __init__(self, config: Optional[MemoryConfiguration] = None):
         self.config = config or MemoryConfiguration()
         self.user_memories: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        self._write_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
         self.memory_dir = Path("data/langchain_memory")
         self.memory_dir.mkdir(parents=True, exist_ok=True)
         self._cleanup_task = None
@@ -63,6 +79,13 @@ class LangChainMemoryService:
             except asyncio.CancelledError:
                 pass
     
+    def reset(self):
+        """Drop every cached history and delete all stored history files."""
+        self.user_memories.clear()
+        self._write_locks.clear()
+        shutil.rmtree(self.memory_dir, ignore_errors=True)
+        self.memory_dir.mkdir(parents=True, exist_ok=True)
+    
     def _get_memory_key(self, user_id: str, session_id: str = "default") -> str:
         """Generate a unique key for user memory."""
         return f"{user_id}_{session_id}"
@@ -71,49 +94,58 @@ class LangChainMemoryService:
         """Get the file path for storing chat history."""
         return str(self.memory_dir / f"{user_id}_{session_id}_history.json")
     
-    def get_chat_history_for_user(self, user_id: str, session_id: str = "default") -> FileChatMessageHistory:
+    def get_chat_history_for_user(self, user_id: str, session_id: str = "default") -> BaseChatMessageHistory:
         """Get or create chat history instance for a user."""
         memory_key = self._get_memory_key(user_id, session_id)
+        now = datetime.now(timezone.utc)
         
-        if memory_key not in self.user_memories:
-            chat_history_file = self._get_chat_history_file(user_id, session_id)
-            
-            # Ensure the file exists and has valid JSON content
-            file_path = Path(chat_history_file)
-            if not file_path.exists():
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                file_path.write_text("[]", encoding="utf-8")
-            elif file_path.read_text(encoding="utf-8").strip() == "":
-                file_path.write_text("[]", encoding="utf-8")
+        memory_info = self.user_memories.get(memory_key)
+        if memory_info is None:
+            if self.config.memory_storage_backend == "file":
+                chat_history_file = self._get_chat_history_file(user_id, session_id)
                 
-            chat_history = FileChatMessageHistory(file_path=chat_history_file)
+                # Ensure the file exists and has valid JSON content
+                file_path = Path(chat_history_file)
+                if not file_path.exists():
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    file_path.write_text("[]", encoding="utf-8")
+                elif file_path.read_text(encoding="utf-8").strip() == "":
+                    file_path.write_text("[]", encoding="utf-8")
+                    
+                chat_history = BulkFileChatMessageHistory(file_path=chat_history_file)
+            else:
+                chat_history = InMemoryChatMessageHistory()
             
-            self.user_memories[memory_key] = {
+            memory_info = self.user_memories[memory_key] = {
                 "chat_history": chat_history,
-                "created_at": datetime.now(timezone.utc),
-                "last_accessed": datetime.now(timezone.utc),
+                "created_at": now,
                 "user_id": user_id,
                 "session_id": session_id
             }
         
         # Update last accessed time
-        self.user_memories[memory_key]["last_accessed"] = datetime.now(timezone.utc)
-        return self.user_memories[memory_key]["chat_history"]
+        memory_info["last_accessed"] = now
+        return memory_info["chat_history"]
     
     async def add_exchange(self, user_id: str, user_message: str, ai_response: str, session_id: str = "default"):
         """Add a user-AI exchange to memory."""
+        await self.add_exchanges_bulk(user_id, [(user_message, ai_response)], session_id)
+    
+    async def add_exchanges_bulk(self, user_id: str, exchanges: List[Tuple[str, str]], session_id: str = "default"):
+        """Add several (user_message, ai_response) exchanges to memory with a single history write."""
         chat_history = self.get_chat_history_for_user(user_id, session_id)
         
-        # Add messages to chat history
-        await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: self._add_messages_to_history(chat_history, user_message, ai_response)
-        )
-    
-    def _add_messages_to_history(self, chat_history: FileChatMessageHistory, user_message: str, ai_response: str):
-        """Add messages to chat history synchronously."""
-        chat_history.add_user_message(user_message)
-        chat_history.add_ai_message(ai_response)
+        messages: List[BaseMessage] = []
+        for user_message, ai_response in exchanges:
+            messages.append(HumanMessage(content=user_message))
+            messages.append(AIMessage(content=ai_response))
+        
+        # Serialize writers per history so concurrent exchanges are not lost
+        async with self._write_locks[self._get_memory_key(user_id, session_id)]:
+            await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: chat_history.add_messages(messages)
+            )
     
     async def get_conversation_context(self, user_id: str, session_id: str = "default") -> str:
         """Get conversation context as formatted string for LLM."""
@@ -176,6 +208,7 @@ class LangChainMemoryService:
                     lambda: chat_history.clear()
                 )
                 del self.user_memories[memory_key]
+            self._write_locks.pop(memory_key, None)
             
             # Remove history file
             history_file = Path(self._get_chat_history_file(user_id, session_id))
@@ -195,6 +228,7 @@ class LangChainMemoryService:
                     lambda: chat_history.clear()
                 )
                 del self.user_memories[key]
+                self._write_locks.pop(key, None)
             
             # Remove history files
             for file_path in self.memory_dir.glob(f"{user_id}_*_history.json"):
@@ -202,9 +236,9 @@ class LangChainMemoryService:
     
     async def get_user_memory_stats(self, user_id: str, session_id: str = "default") -> Dict[str, Any]:
         """Get memory statistics for a specific user."""
-        memory_key = self._get_memory_key(user_id, session_id)
+        memory_info = self.user_memories.get(self._get_memory_key(user_id, session_id))
         
-        if memory_key not in self.user_memories:
+        if memory_info is None:
             return {
                 "user_id": user_id,
                 "session_id": session_id,
@@ -212,7 +246,6 @@ class LangChainMemoryService:
                 "message_count": 0
             }
         
-        memory_info = self.user_memories[memory_key]
         chat_history = memory_info["chat_history"]
         
         try:
@@ -231,7 +264,11 @@ class LangChainMemoryService:
                 "message_count": message_count,
                 "created_at": memory_info["created_at"],
                 "last_accessed": memory_info["last_accessed"],
-                "memory_type": "FileChatMessageHistory"
+                "memory_type": (
+                    "FileChatMessageHistory"
+                    if isinstance(chat_history, FileChatMessageHistory)
+                    else type(chat_history).__name__
+                )
             }
             
         except Exception as e:
@@ -323,9 +360,9 @@ class LangChainMemoryService:
     
     async def get_conversation_history_formatted(self, user_id: str, session_id: str = "default", limit: int = 50) -> Dict[str, Any]:
         """Get conversation history in a formatted structure."""
-        memory_key = self._get_memory_key(user_id, session_id)
+        memory_info = self.user_memories.get(self._get_memory_key(user_id, session_id))
         
-        if memory_key not in self.user_memories:
+        if memory_info is None:
             return {
                 "user_id": user_id,
                 "session_id": session_id,
@@ -333,7 +370,6 @@ class LangChainMemoryService:
                 "message_count": 0
             }
         
-        memory_info = self.user_memories[memory_key]
         chat_history = memory_info["chat_history"]
         
         try:
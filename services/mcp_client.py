@@ -5,15 +5,54 @@ Scaffold Your Shape MCP server and loading LangChain tools and resources.
 """
 
 import asyncio
-from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 import httpx
 import json
+import orjson
+import time
 
 from langchain_core.tools import BaseTool, tool
 from pydantic import BaseModel, Field, create_model
 from config.settings import get_configuration
 
+# How long a tools/list result is reused; the tool set only changes on MCP
+# server deploys, while one agent swarm build lists it once per agent
+TOOLS_CACHE_TTL_SECONDS = 60.0
+
+# Connection pool shared by every client built through create_mcp_client
+_shared_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled HTTP client, creating it on first use."""
+    global _shared_http_client
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            follow_redirects=True
+        )
+    return _shared_http_client
+
+
+async def close_shared_http_client():
+    """Close the pooled HTTP client; the next use opens a fresh one."""
+    global _shared_http_client
+    if _shared_http_client is not None:
+        await _shared_http_client.aclose()
+        _shared_http_client = None
+
+
+def format_tool_content(content: Any) -> str:
+    """Render MCP tool result content as text, serializing structured content to JSON."""
+    if isinstance(content, str):
+        return content
+    try:
+        return orjson.dumps(content).decode()
+    except TypeError:
+        # orjson rejects integers beyond 64 bits, which json handles
+        return json.dumps(content, ensure_ascii=False)
+
 
 class PiliMCPClient:
     """Client for connecting to Scaffold Your Shape MCP server.
@@ -21,22 +60,43 @@ class PiliMCPClient:
     Loads LangChain-compatible tools from the MCP server for use in agent workflows.
     """
     
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(self, base_url: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None,
+                 use_shared_pool: bool = False):
         """Initialize the Pili MCP client.
         
+        Without ``http_client`` or ``use_shared_pool`` the MCP client opens its
+        own HTTP client and closes it in ``close()``.
+        
         Args:
             base_url: Base URL for the MCP server. If None, uses configuration.
+            http_client: HTTP client to send requests with, owned by the caller.
+            use_shared_pool: Send requests through the process-wide pool from
+                ``get_shared_http_client()``, looked up on every request so a
+                pool reopened after shutdown is picked up.
         """
         self.config = get_configuration()
         self.base_url = base_url or self.config.mcp_base_url
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(30.0),
-            follow_redirects=True
-        )
+        self._owns_client = http_client is None and not use_shared_pool
+        self._http_client = http_client
+        if self._owns_client:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0),
+                follow_redirects=True
+            )
+        self._tools_cache: Optional[List[Dict[str, Any]]] = None
+        self._tools_cached_at = 0.0
+        self._tools_lock = asyncio.Lock()
+        self._input_models: Dict[str, type[BaseModel]] = {}
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client used for requests to the MCP server."""
+        return self._http_client or get_shared_http_client()
     
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client unless it is shared."""
+        if self._owns_client:
+            await self._http_client.aclose()
     
     async def __aenter__(self):
         """Async context manager entry."""
@@ -47,7 +107,28 @@ class PiliMCPClient:
         await self.close()
     
     async def list_tools(self) -> List[Dict[str, Any]]:
-        """Get list of available tools from MCP server."""
+        """Get list of available tools from MCP server.
+        
+        Successful listings are cached for ``TOOLS_CACHE_TTL_SECONDS``, and
+        concurrent callers share a single in-flight request.
+        """
+        async with self._tools_lock:
+            if (self._tools_cache is not None
+                    and time.monotonic() - self._tools_cached_at < TOOLS_CACHE_TTL_SECONDS):
+                return self._tools_cache
+            
+            tools = await self._fetch_tools()
+            if tools is None:
+                return []
+            
+            self._tools_cache = tools
+            self._tools_cached_at = time.monotonic()
+            # Schemas may have changed with the new listing
+            self._input_models.clear()
+            return tools
+    
+    async def _fetch_tools(self) -> Optional[List[Dict[str, Any]]]:
+        """Request the tool list from the MCP server; None on failure."""
         try:
             response = await self.client.post(
                 self.base_url,
@@ -63,11 +144,11 @@ class PiliMCPClient:
                 return result.get("result", {}).get("tools", [])
             else:
                 print(f"Failed to get MCP tools: {response.status_code}")
-                return []
+                return None
                 
         except Exception as e:
             print(f"Error getting MCP tools: {str(e)}")
-            return []
+            return None
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """Call a tool on the MCP server."""
@@ -88,7 +169,7 @@ class PiliMCPClient:
                 result = response.json()
                 if result.get("result"):
                     content = result.get("result", {}).get("content", "")
-                    return content if isinstance(content, str) else json.dumps(content)
+                    return format_tool_content(content)
                 else:
                     error_msg = result.get("error", {}).get("message", "Unknown error")
                     return f"Tool execution failed: {error_msg}"
@@ -141,8 +222,11 @@ class PiliMCPClient:
                             tool_schema: Dict[str, Any], user_id: str) -> BaseTool:
         """Create a LangChain tool from MCP tool definition."""
         
-        # Create Pydantic model for validation
-        InputModel = self._create_pydantic_model(tool_name, tool_schema)
+        # Create Pydantic model for validation, once per tool listing
+        InputModel = self._input_models.get(tool_name)
+        if InputModel is None:
+            InputModel = self._create_pydantic_model(tool_name, tool_schema)
+            self._input_models[tool_name] = InputModel
         
         # Create the tool function
         @tool(tool_name, args_schema=InputModel, return_direct=False)
@@ -256,17 +340,19 @@ class PiliMCPClient:
 
 
 # Factory function for creating client instances
-def create_mcp_client(base_url: Optional[str] = None) -> PiliMCPClient:
+def create_mcp_client(base_url: Optional[str] = None,
+                      http_client: Optional[httpx.AsyncClient] = None) -> PiliMCPClient:
     """Create a new MCP client instance.
     
     Args:
         base_url: Optional base URL override
+        http_client: Optional HTTP client; defaults to the shared connection pool
         
     Returns:
         PiliMCPClient instance
     """
-    return PiliMCPClient(base_url)
+    return PiliMCPClient(base_url, http_client, use_shared_pool=http_client is None)
 
 
 # Global client instance (for backwards compatibility)
-mcp_client = create_mcp_client() 
\ No newline at end of file
+mcp_client = PiliMCPClient() 
\ No newline at end of file
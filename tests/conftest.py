@@ -0,0 +1,87 @@
+"""Shared pytest configuration for the test suite.
+
+Test modules import the agent stack (``agents.agent``, ``main`` and the
+LangChain memory service) inside fixtures rather than at module level, so
+collecting the suite does not pay for loading LangChain and OpenAI.
+"""
+
+import asyncio
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+
+# Plain attribute bag shared by every test; cheaper than a MagicMock and
+# raises on unknown settings instead of silently inventing them
+TEST_CONFIG = SimpleNamespace(
+    memory_enabled=True,
+    memory_max_messages_per_user=50,
+    memory_max_characters_per_message=1000,
+    memory_cleanup_interval_hours=1,
+    memory_max_conversation_age_days=7,
+    memory_enable_compression=True,
+    memory_storage_backend="memory",
+    memory_type="buffer_window",
+    llm_provider="openai",
+    openai_model="gpt-3.5-turbo",
+    openai_api_key="test-key",
+    mcp_base_url="http://localhost:3005/api/mcp"
+)
+
+# Modules that bind get_configuration at import time and read it per request;
+# test modules list any further ones in EXTRA_CONFIGURATION_TARGETS
+CONFIGURATION_TARGETS = (
+    'config.settings.get_configuration',
+    'agents.agent.get_configuration',
+)
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """Share a single event loop across the whole test session."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Import the FastAPI application once per session, on first use."""
+    from main import app as _app
+    return _app
+
+
+@pytest.fixture(scope="module")
+def test_config(request):
+    """Patch the application configuration once for the requesting module.
+    
+    Tests that need different values set attributes on the returned config
+    with ``monkeypatch.setattr`` so they are restored afterwards.
+    """
+    targets = CONFIGURATION_TARGETS + tuple(getattr(request.module, "EXTRA_CONFIGURATION_TARGETS", ()))
+    
+    # Import every target first: a module first imported while the patch is
+    # active would bind the test lambda, which would then be "restored"
+    for target in targets:
+        importlib.import_module(target.rpartition('.')[0])
+    
+    with pytest.MonkeyPatch.context() as mp:
+        for target in targets:
+            mp.setattr(target, lambda: TEST_CONFIG)
+        yield TEST_CONFIG
+
+
+@pytest.fixture(autouse=True)
+def reset_memory(request):
+    """Clear the shared memory service after every test that uses one.
+    
+    Test modules provide a module- or class-scoped ``memory_service``
+    fixture; tests are isolated by resetting it rather than rebuilding it.
+    """
+    memory_service = None
+    if "memory_service" in request.fixturenames:
+        memory_service = request.getfixturevalue("memory_service")
+    yield
+    if memory_service is not None:
+        memory_service.reset()
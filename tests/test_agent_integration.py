@@ -1,16 +1,18 @@
 """Integration tests for the agent system with memory."""
 
 import pytest
+import pytest_asyncio
 import asyncio
 import tempfile
 import shutil
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
+from langchain_core.messages import AIMessage
 
-from agents.agent import PiliAgentSystem
-from services.langchain_memory_service import LangChainMemoryService
 from models.memory import MemoryConfiguration
-from config.settings import get_configuration
+
+
+pytestmark = pytest.mark.usefixtures("test_config")
 
 
 class TestAgentMemoryIntegration:
@@ -23,37 +25,24 @@ class TestAgentMemoryIntegration:
         yield Path(temp_dir)
         shutil.rmtree(temp_dir)
     
-    @pytest.fixture
-    def test_config(self):
-        """Create test configuration."""
-        with patch('config.settings.get_configuration') as mock_config:
-            mock_config.return_value = MagicMock(
-                memory_enabled=True,
-                memory_max_messages_per_user=50,
-                memory_max_characters_per_message=1000,
-                memory_cleanup_interval_hours=1,
-                memory_max_conversation_age_days=7,
-                memory_enable_compression=True,
-                memory_storage_backend="file",
-                memory_type="buffer_window",
-                llm_provider="openai",
-                openai_model="gpt-3.5-turbo",
-                openai_api_key="test-key"
-            )
-            yield mock_config.return_value
-    
-    @pytest.fixture
-    def agent_system(self, temp_dir, test_config):
+    @pytest_asyncio.fixture
+    async def agent_system(self, temp_dir, test_config, monkeypatch):
         """Create agent system for testing."""
-        with patch('services.langchain_memory_service.langchain_memory_service') as mock_memory:
-            # Create a real memory service for testing
-            memory_service = LangChainMemoryService()
-            memory_service.memory_dir = temp_dir / "test_memory"
-            memory_service.memory_dir.mkdir(parents=True, exist_ok=True)
-            mock_memory.return_value = memory_service
-            
-            system = PiliAgentSystem()
-            yield system, memory_service
+        from agents.agent import PiliAgentSystem
+        from services.langchain_memory_service import LangChainMemoryService
+        
+        # Create a real memory service for testing, backed by the in-memory store
+        memory_service = LangChainMemoryService(
+            MemoryConfiguration(memory_storage_backend=test_config.memory_storage_backend)
+        )
+        memory_service.memory_dir = temp_dir / "test_memory"
+        memory_service.memory_dir.mkdir(parents=True, exist_ok=True)
+        monkeypatch.setattr('agents.agent.langchain_memory_service', memory_service)
+        
+        system = PiliAgentSystem()
+        yield system, memory_service
+        
+        await memory_service.shutdown()
     
     @pytest.mark.asyncio
     async def test_memory_initialization(self, agent_system):
@@ -106,33 +95,25 @@ class TestAgentMemoryIntegration:
         assert stats_after["has_memory"] is False
     
     @pytest.mark.asyncio
-    async def test_process_request_with_memory_disabled(self, agent_system):
+    async def test_process_request_with_memory_disabled(self, agent_system, test_config, monkeypatch):
         """Test processing request when memory is disabled."""
         system, memory_service = agent_system
         
-        with patch('config.settings.get_configuration') as mock_config:
-            mock_config.return_value.memory_enabled = False
+        monkeypatch.setattr(test_config, "memory_enabled", False)
+        
+        # Mock the agent system to avoid actual LLM calls
+        with patch.object(system, 'get_agent_for_user', new_callable=AsyncMock) as mock_get_agent:
+            mock_result = {
+                "messages": [
+                    AIMessage(content="Test response", name="assistant")
+                ]
+            }
+            mock_agent = MagicMock(ainvoke=AsyncMock(return_value=mock_result))
+            mock_get_agent.return_value = mock_agent
             
-            # Mock the agent system to avoid actual LLM calls
-            with patch.object(system, 'get_agent_for_user') as mock_get_agent:
-                mock_agent = MagicMock()
-                mock_result = {
-                    "messages": [
-                        MagicMock(content="Test response", name="assistant")
-                    ]
-                }
-                mock_agent.ainvoke.return_value = mock_result
-                mock_get_agent.return_value = mock_agent
-                
-                with patch.object(system, '_finalize_response') as mock_finalize:
-                    mock_finalize.return_value = {
-                        "response": "Test response",
-                        "logs": [],
-                        "finalized": True
-                    }
-                    
-                    result = await system.process_request("test_user", "Hello")
-                    assert result["response"] == "Test response"
+            result = await system.process_request("test_user", "Hello")
+            assert result["response"] == "Test response"
+            mock_agent.ainvoke.assert_awaited_once()
     
     @pytest.mark.asyncio
     async def test_memory_context_injection(self, agent_system):
@@ -215,6 +196,7 @@ class TestAgentMemoryIntegration:
             # Should handle gracefully
             assert "success" in result or "error" in result
     
+    @pytest.mark.slow
     @pytest.mark.asyncio
     async def test_concurrent_memory_access(self, agent_system):
         """Test concurrent access to memory service."""
@@ -1,134 +1,204 @@
 """API integration tests for the FastAPI endpoints."""
 
 import pytest
+import pytest_asyncio
 import asyncio
-import tempfile
-import shutil
-from pathlib import Path
-from unittest.mock import patch, MagicMock
-from fastapi.testclient import TestClient
+from collections import defaultdict
+from unittest.mock import AsyncMock
+from httpx import AsyncClient, ASGITransport
+from langchain_core.messages import AIMessage
 import json
 
-from main import app
-from services.langchain_memory_service import LangChainMemoryService
+from models.memory import MemoryConfiguration
+
+
+# Patched on top of the shared targets in conftest.py
+EXTRA_CONFIGURATION_TARGETS = ('main.get_configuration',)
+
+pytestmark = pytest.mark.usefixtures("test_config")
+
+
+async def seed(memory_service, items):
+    """Seed memory with ``(user_id, user_message, ai_response[, session_id])`` items.
+    
+    Exchanges sharing a history are written with one bulk call, and distinct
+    histories are written concurrently.
+    """
+    grouped = defaultdict(list)
+    for user_id, user_message, ai_response, *session in items:
+        grouped[(user_id, session[0] if session else "default")].append((user_message, ai_response))
+    
+    await asyncio.gather(*(
+        memory_service.add_exchanges_bulk(user_id, exchanges, session_id)
+        for (user_id, session_id), exchanges in grouped.items()
+    ))
+
+
+class MockAgentApp:
+    """Deterministic, zero-latency stand-in for a compiled agent swarm.
+    
+    Streams back whatever response the mocked ``process_request`` is configured
+    with, so streaming and non-streaming tests share the same setup.
+    """
+    
+    def __init__(self, system):
+        self.system = system
+    
+    async def astream(self, initial_state, config=None):
+        response = self.system.process_request.return_value["response"]
+        yield {"orchestration_agent": {"messages": [AIMessage(content=response, name="orchestration_agent")]}}
+
+
+@pytest.fixture(scope="module")
+def mock_agent_backend():
+    """Replace the LLM-backed agent paths with a mock backend for the whole module.
+    
+    The mocks return immediately and streaming runs without its per-word delay.
+    Tests configure responses by assigning
+    ``mock_agent_system.process_request.return_value``.
+    """
+    from agents.agent import agent_system
+    
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(agent_system, "process_request", AsyncMock())
+        mp.setattr(agent_system, "get_agent_for_user", AsyncMock(return_value=MockAgentApp(agent_system)))
+        mp.setattr("agents.utils.STREAM_WORD_DELAY", 0.0)
+        yield agent_system
+
+
+@pytest_asyncio.fixture(scope="module")
+async def api_client(app):
+    """Create a single ASGI client shared by every test in the module.
+    
+    ASGITransport does not send lifespan events, so the application's
+    startup and shutdown are run around the client explicitly.
+    """
+    transport = ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+@pytest_asyncio.fixture(scope="module")
+async def memory_service(tmp_path_factory, test_config):
+    """Create one memory service for the module; tests are isolated by reset()."""
+    from services.langchain_memory_service import LangChainMemoryService
+    
+    service = LangChainMemoryService(
+        MemoryConfiguration(memory_storage_backend=test_config.memory_storage_backend)
+    )
+    service.memory_dir = tmp_path_factory.mktemp("test_memory")
+    
+    yield service
+    
+    await service.shutdown()
 
 
 class TestAPIIntegration:
     """Integration tests for API endpoints."""
     
     @pytest.fixture
-    def temp_dir(self):
-        """Create a temporary directory for testing."""
-        temp_dir = tempfile.mkdtemp()
-        yield Path(temp_dir)
-        shutil.rmtree(temp_dir)
+    def mock_agent_system(self, mock_agent_backend):
+        """Provide the pre-patched agent system with a clean process_request mock."""
+        mock_agent_backend.process_request.reset_mock(return_value=True)
+        return mock_agent_backend
     
-    @pytest.fixture
-    def test_client(self, temp_dir):
-        """Create test client with mocked dependencies."""
-        memory_service = LangChainMemoryService()
-        memory_service.memory_dir = temp_dir / "test_memory"
-        memory_service.memory_dir.mkdir(parents=True, exist_ok=True)
-        
-        with patch('config.settings.get_configuration') as mock_config:
-            mock_config.return_value = MagicMock(
-                memory_enabled=True,
-                memory_max_messages_per_user=50,
-                memory_max_characters_per_message=1000,
-                memory_cleanup_interval_hours=1,
-                memory_max_conversation_age_days=7,
-                memory_enable_compression=True,
-                memory_storage_backend="file",
-                memory_type="buffer_window"
-            )
-            
-            with patch('main.langchain_memory_service', memory_service):
-                yield TestClient(app), memory_service
+    @pytest_asyncio.fixture
+    async def test_client(self, api_client, memory_service, mock_agent_system, monkeypatch):
+        """Pair the shared client with the shared memory service."""
+        monkeypatch.setattr('main.langchain_memory_service', memory_service)
+        monkeypatch.setattr('agents.agent.langchain_memory_service', memory_service)
+        monkeypatch.setattr('services.langchain_memory_service.langchain_memory_service', memory_service)
+        
+        yield api_client, memory_service
     
-    def test_health_endpoint(self, test_client):
+    @pytest.mark.asyncio
+    async def test_health_endpoint(self, test_client):
         """Test the health endpoint."""
         client, _ = test_client
-        response = client.get("/api/health")
+        response = await client.get("/api/health")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
     
-    def test_chat_endpoint_basic(self, test_client):
+    @pytest.mark.asyncio
+    async def test_chat_endpoint_basic(self, test_client, mock_agent_system):
         """Test basic chat endpoint functionality."""
         client, memory_service = test_client
         
-        # Mock the agent system to avoid actual LLM calls
-        with patch('agents.agent.agent_system') as mock_agent_system:
-            mock_agent_system.process_request.return_value = {
-                "response": "Hello! I'm Pili, your fitness assistant! 💪",
-                "logs": [{"agent_system": "test", "status": "success"}]
-            }
-            
-            response = client.post("/api/chat", json={
-                "user_id": "test_user",
-                "message": "Hello",
-                "session_id": "test_session",
-                "stream": False
-            })
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert "response" in data
-            assert "logs" in data
-            assert "Pili" in data["response"]
+        mock_agent_system.process_request.return_value = {
+            "response": "Hello! I'm Pili, your fitness assistant! 💪",
+            "logs": [{"agent_system": "test", "status": "success"}]
+        }
+        
+        response = await client.post("/api/chat", json={
+            "user_id": "test_user",
+            "message": "Hello",
+            "session_id": "test_session",
+            "stream": False
+        })
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert "response" in data
+        assert "logs" in data
+        assert "Pili" in data["response"]
     
-    def test_chat_endpoint_with_session(self, test_client):
+    @pytest.mark.asyncio
+    async def test_chat_endpoint_with_session(self, test_client, mock_agent_system):
         """Test chat endpoint with session ID."""
         client, memory_service = test_client
         
-        with patch('agents.agent.agent_system') as mock_agent_system:
-            mock_agent_system.process_request.return_value = {
-                "response": "Got it!",
-                "logs": []
-            }
-            
-            response = client.post("/api/chat", json={
-                "user_id": "test_user",
-                "message": "Test message",
-                "session_id": "custom_session",
-                "stream": False
-            })
-            
-            assert response.status_code == 200
-            # Verify that the correct session ID was passed
-            mock_agent_system.process_request.assert_called_with(
-                "test_user", "Test message", "custom_session"
-            )
+        mock_agent_system.process_request.return_value = {
+            "response": "Got it!",
+            "logs": []
+        }
+        
+        response = await client.post("/api/chat", json={
+            "user_id": "test_user",
+            "message": "Test message",
+            "session_id": "custom_session",
+            "stream": False
+        })
+        
+        assert response.status_code == 200
+        # Verify that the correct session ID was passed
+        mock_agent_system.process_request.assert_called_with(
+            "test_user", "Test message", "custom_session"
+        )
     
-    def test_chat_endpoint_streaming(self, test_client):
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_chat_endpoint_streaming(self, test_client, mock_agent_system):
         """Test streaming chat endpoint."""
         client, memory_service = test_client
         
-        with patch('agents.agent.agent_system') as mock_agent_system:
-            mock_agent_system.process_request.return_value = {
-                "response": "Streaming response",
-                "logs": [],
-                "chain_of_thought": [],
-                "finalized": True
-            }
-            
-            response = client.post("/api/chat", json={
-                "user_id": "test_user",
-                "message": "Hello",
-                "stream": True
-            })
-            
-            assert response.status_code == 200
-            assert response.headers["content-type"] == "text/plain; charset=utf-8"
+        mock_agent_system.process_request.return_value = {
+            "response": "Streaming response",
+            "logs": [],
+            "chain_of_thought": [],
+            "finalized": True
+        }
+        
+        response = await client.post("/api/chat", json={
+            "user_id": "test_user",
+            "message": "Hello",
+            "stream": True
+        })
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/plain; charset=utf-8"
+        assert "Streaming" in response.text
     
-    def test_memory_stats_endpoint(self, test_client):
+    @pytest.mark.asyncio
+    async def test_memory_stats_endpoint(self, test_client):
         """Test memory statistics endpoint."""
         client, memory_service = test_client
         
         # Add some test memory
-        asyncio.run(memory_service.add_exchange("test_user", "Hello", "Hi there!"))
+        await memory_service.add_exchange("test_user", "Hello", "Hi there!")
         
-        response = client.get("/api/memory/stats/test_user")
+        response = await client.get("/api/memory/stats/test_user")
         assert response.status_code == 200
         
         data = response.json()
@@ -136,15 +206,18 @@ class TestAPIIntegration:
         assert data["has_memory"] is True
         assert data["message_count"] == 2
     
-    def test_global_memory_stats_endpoint(self, test_client):
+    @pytest.mark.asyncio
+    async def test_global_memory_stats_endpoint(self, test_client):
         """Test global memory statistics endpoint."""
         client, memory_service = test_client
         
         # Add some test memory for multiple users
-        asyncio.run(memory_service.add_exchange("user1", "Hello", "Hi!"))
-        asyncio.run(memory_service.add_exchange("user2", "Test", "Response"))
+        await seed(memory_service, [
+            ("user1", "Hello", "Hi!"),
+            ("user2", "Test", "Response"),
+        ])
         
-        response = client.get("/api/memory/global-stats")
+        response = await client.get("/api/memory/global-stats")
         assert response.status_code == 200
         
         data = response.json()
@@ -153,19 +226,20 @@ class TestAPIIntegration:
         assert data["stats"]["total_users"] >= 2
         assert data["stats"]["total_messages"] >= 4
     
-    def test_clear_memory_endpoint(self, test_client):
+    @pytest.mark.asyncio
+    async def test_clear_memory_endpoint(self, test_client):
         """Test clear memory endpoint."""
         client, memory_service = test_client
         
         # Add some test memory
-        asyncio.run(memory_service.add_exchange("test_user", "Hello", "Hi there!"))
+        await memory_service.add_exchange("test_user", "Hello", "Hi there!")
         
         # Verify memory exists
-        stats_before = asyncio.run(memory_service.get_user_memory_stats("test_user"))
+        stats_before = await memory_service.get_user_memory_stats("test_user")
         assert stats_before["has_memory"] is True
         
         # Clear memory
-        response = client.post("/api/memory/clear", json={
+        response = await client.post("/api/memory/clear", json={
             "user_id": "test_user",
             "session_id": "default"
         })
@@ -175,19 +249,22 @@ class TestAPIIntegration:
         assert data["success"] is True
         
         # Verify memory is cleared
-        stats_after = asyncio.run(memory_service.get_user_memory_stats("test_user"))
+        stats_after = await memory_service.get_user_memory_stats("test_user")
         assert stats_after["has_memory"] is False
     
-    def test_search_memory_endpoint(self, test_client):
+    @pytest.mark.asyncio
+    async def test_search_memory_endpoint(self, test_client):
         """Test memory search endpoint."""
         client, memory_service = test_client
         
         # Add some test conversations
-        asyncio.run(memory_service.add_exchange("test_user", "I want to go running", "Great choice!"))
-        asyncio.run(memory_service.add_exchange("test_user", "How about swimming?", "Swimming is excellent!"))
-        asyncio.run(memory_service.add_exchange("test_user", "I prefer running", "Running it is!"))
+        await seed(memory_service, [
+            ("test_user", "I want to go running", "Great choice!"),
+            ("test_user", "How about swimming?", "Swimming is excellent!"),
+            ("test_user", "I prefer running", "Running it is!"),
+        ])
         
-        response = client.post("/api/memory/search", json={
+        response = await client.post("/api/memory/search", json={
             "user_id": "test_user",
             "query": "running",
             "max_results": 10
@@ -203,15 +280,18 @@ class TestAPIIntegration:
         for result in data["results"]:
             assert "running" in result["content"].lower()
     
-    def test_conversation_history_endpoint(self, test_client):
+    @pytest.mark.asyncio
+    async def test_conversation_history_endpoint(self, test_client):
         """Test conversation history endpoint."""
         client, memory_service = test_client
         
         # Add some test conversation
-        asyncio.run(memory_service.add_exchange("test_user", "Hello", "Hi there!"))
-        asyncio.run(memory_service.add_exchange("test_user", "How are you?", "I'm great!"))
+        await seed(memory_service, [
+            ("test_user", "Hello", "Hi there!"),
+            ("test_user", "How are you?", "I'm great!"),
+        ])
         
-        response = client.get("/api/memory/conversation/test_user?session_id=default&limit=10")
+        response = await client.get("/api/memory/conversation/test_user?session_id=default&limit=10")
         
         assert response.status_code == 200
         data = response.json()
@@ -226,82 +306,79 @@ class TestAPIIntegration:
         assert first_message["content"] == "Hello"
         assert "timestamp" in first_message
     
-    def test_memory_disabled_endpoints(self, test_client):
+    @pytest.mark.asyncio
+    async def test_memory_disabled_endpoints(self, test_client, test_config, monkeypatch):
         """Test endpoints when memory is disabled."""
         client, memory_service = test_client
         
-        with patch('config.settings.get_configuration') as mock_config:
-            mock_config.return_value.memory_enabled = False
-            
-            # Test global stats
-            response = client.get("/api/memory/global-stats")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["memory_enabled"] is False
-            
-            # Test search
-            response = client.post("/api/memory/search", json={
-                "user_id": "test_user",
-                "query": "test"
-            })
-            assert response.status_code == 503
-            
-            # Test conversation history
-            response = client.get("/api/memory/conversation/test_user")
-            assert response.status_code == 503
+        monkeypatch.setattr(test_config, "memory_enabled", False)
+        
+        # Test global stats
+        response = await client.get("/api/memory/global-stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["memory_enabled"] is False
+        
+        # Test search
+        response = await client.post("/api/memory/search", json={
+            "user_id": "test_user",
+            "query": "test"
+        })
+        assert response.status_code == 503
+        
+        # Test conversation history
+        response = await client.get("/api/memory/conversation/test_user")
+        assert response.status_code == 503
     
-    def test_api_error_handling(self, test_client):
+    @pytest.mark.asyncio
+    async def test_api_error_handling(self, test_client):
         """Test API error handling."""
         client, memory_service = test_client
         
         # Test invalid user ID in stats
-        response = client.get("/api/memory/stats/")
+        response = await client.get("/api/memory/stats/")
         assert response.status_code == 404
         
         # Test invalid request body in clear memory
-        response = client.post("/api/memory/clear", json={})
+        response = await client.post("/api/memory/clear", json={})
         assert response.status_code == 422  # Validation error
         
         # Test invalid search query
-        response = client.post("/api/memory/search", json={
+        response = await client.post("/api/memory/search", json={
             "query": "test"  # Missing user_id
         })
         assert response.status_code == 422
     
-    def test_chat_endpoint_validation(self, test_client):
+    @pytest.mark.parametrize("payload", [
+        {"message": "Hello"},  # Missing user_id
+        {"user_id": "test_user"},  # Missing message
+        {"user_id": "test_user", "message": ""},  # Empty message
+        {"user_id": "test_user", "message": "   "},  # Whitespace-only message
+    ], ids=["missing_user_id", "missing_message", "empty_message", "whitespace_message"])
+    @pytest.mark.asyncio
+    async def test_chat_endpoint_validation(self, test_client, payload):
         """Test chat endpoint request validation."""
         client, memory_service = test_client
         
-        # Test missing user_id
-        response = client.post("/api/chat", json={
-            "message": "Hello"
-        })
-        assert response.status_code == 422
-        
-        # Test missing message
-        response = client.post("/api/chat", json={
-            "user_id": "test_user"
-        })
-        assert response.status_code == 422
-        
-        # Test empty message
-        response = client.post("/api/chat", json={
-            "user_id": "test_user",
-            "message": ""
-        })
+        response = await client.post("/api/chat", json=payload)
         assert response.status_code == 422
     
-    def test_session_isolation(self, test_client):
+    @pytest.mark.asyncio
+    async def test_session_isolation(self, test_client):
         """Test that different sessions are properly isolated."""
         client, memory_service = test_client
         
         # Add memory to different sessions
-        asyncio.run(memory_service.add_exchange("test_user", "Workout question", "Workout answer", "workout"))
-        asyncio.run(memory_service.add_exchange("test_user", "Nutrition question", "Nutrition answer", "nutrition"))
+        await seed(memory_service, [
+            ("test_user", "Workout question", "Workout answer", "workout"),
+            ("test_user", "Nutrition question", "Nutrition answer", "nutrition"),
+        ])
         
-        # Get conversation history for each session
-        workout_response = client.get("/api/memory/conversation/test_user?session_id=workout")
-        nutrition_response = client.get("/api/memory/conversation/test_user?session_id=nutrition")
+        # Get conversation history for each session concurrently
+        workout_response, nutrition_response = await asyncio.gather(
+            client.get("/api/memory/conversation/test_user?session_id=workout"),
+            client.get("/api/memory/conversation/test_user?session_id=nutrition")
+        )
         
         assert workout_response.status_code == 200
         assert nutrition_response.status_code == 200
@@ -321,24 +398,29 @@ class TestAPIIntegration:
         assert "Nutrition" not in workout_content
         assert "Workout" not in nutrition_content
     
-    def test_large_conversation_handling(self, test_client):
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_large_conversation_handling(self, test_client):
         """Test handling of large conversations."""
         client, memory_service = test_client
         
-        # Add many messages
-        for i in range(25):  # 25 exchanges = 50 messages
-            asyncio.run(memory_service.add_exchange("test_user", f"Message {i}", f"Response {i}"))
+        # Add many messages in one write: 25 exchanges = 50 messages
+        await memory_service.add_exchanges_bulk(
+            "test_user", [(f"Message {i}", f"Response {i}") for i in range(25)]
+        )
         
-        # Get conversation history with limit
-        response = client.get("/api/memory/conversation/test_user?limit=20")
+        # Get conversation history with limit and stats concurrently
+        response, stats_response = await asyncio.gather(
+            client.get("/api/memory/conversation/test_user?limit=20"),
+            client.get("/api/memory/stats/test_user")
+        )
         
         assert response.status_code == 200
         data = response.json()
         assert data["message_count"] <= 20
         assert len(data["messages"]) <= 20
         
-        # Get stats
-        stats_response = client.get("/api/memory/stats/test_user")
+        # Check stats
         assert stats_response.status_code == 200
         stats_data = stats_response.json()
         assert stats_data["message_count"] == 50
@@ -0,0 +1,220 @@
+"""Unit tests for the MCP client."""
+
+import pytest
+import pytest_asyncio
+import asyncio
+import json
+import httpx
+
+import services.mcp_client as mcp_module
+from services.mcp_client import (
+    PiliMCPClient,
+    create_mcp_client,
+    get_shared_http_client,
+    close_shared_http_client,
+)
+
+
+class FakeMCPServer:
+    """Minimal stand-in for the MCP server's ``tools/list`` and ``tools/call`` endpoints."""
+    
+    def __init__(self):
+        self.requests = 0
+        self.status_code = 200
+        self.tool_content = "Activity logged"
+        self.tools = [{
+            "name": "log_activity",
+            "description": "Log an activity",
+            "inputSchema": {
+                "properties": {"activity": {"type": "string", "description": "Activity name"}},
+                "required": ["activity"]
+            }
+        }]
+    
+    async def handle(self, request):
+        self.requests += 1
+        # Yield to the event loop so concurrent callers overlap
+        await asyncio.sleep(0)
+        if json.loads(request.content)["method"] == "tools/call":
+            return httpx.Response(self.status_code, json={"result": {"content": self.tool_content}})
+        return httpx.Response(self.status_code, json={"result": {"tools": self.tools}})
+
+
+@pytest.fixture
+def mcp_server():
+    """Create a fake MCP server that counts requests."""
+    return FakeMCPServer()
+
+
+@pytest_asyncio.fixture
+async def mcp_client(mcp_server):
+    """Create an MCP client that talks to the fake server."""
+    async with httpx.AsyncClient(transport=httpx.MockTransport(mcp_server.handle)) as http_client:
+        yield PiliMCPClient("http://mcp.test/api/mcp", http_client=http_client)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def close_shared_pool():
+    """Close the shared connection pool after every test."""
+    yield
+    await close_shared_http_client()
+
+
+class TestHTTPClientPooling:
+    """Test cases for HTTP client ownership and the shared pool."""
+    
+    @pytest.mark.asyncio
+    async def test_shared_pool_survives_client_close(self):
+        """Test that closing a pooled MCP client leaves the pool open."""
+        client = create_mcp_client()
+        pool = get_shared_http_client()
+        assert client.client is pool
+        
+        await client.close()
+        
+        assert not pool.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_owned_client_closed_on_close(self):
+        """Test that a client opened by the MCP client is closed with it."""
+        client = PiliMCPClient()
+        http_client = client.client
+        assert http_client is not get_shared_http_client()
+        
+        await client.close()
+        
+        assert http_client.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_caller_client_left_open(self):
+        """Test that a caller-provided HTTP client is not closed by the MCP client."""
+        async with httpx.AsyncClient() as http_client:
+            client = create_mcp_client(http_client=http_client)
+            assert client.client is http_client
+            
+            await client.close()
+            
+            assert not http_client.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_clients_follow_reopened_pool(self):
+        """Test that existing MCP clients use the new pool after the old one is closed."""
+        client = create_mcp_client()
+        old_pool = client.client
+        
+        await close_shared_http_client()
+        
+        assert old_pool.is_closed
+        assert client.client is not old_pool
+        assert not client.client.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_lifespan_opens_and_closes_pool(self, app):
+        """Test that the application lifespan manages the shared pool."""
+        await close_shared_http_client()
+        
+        async with app.router.lifespan_context(app):
+            pool = mcp_module._shared_http_client
+            assert pool is not None
+            assert not pool.is_closed
+        
+        assert pool.is_closed
+        assert mcp_module._shared_http_client is None
+
+
+class TestToolListCache:
+    """Test cases for caching of the MCP tool listing."""
+    
+    @pytest.mark.asyncio
+    async def test_listing_reused_within_ttl(self, mcp_client, mcp_server):
+        """Test that a second listing within the TTL makes no request."""
+        first = await mcp_client.list_tools()
+        second = await mcp_client.list_tools()
+        
+        assert first == second == mcp_server.tools
+        assert mcp_server.requests == 1
+    
+    @pytest.mark.asyncio
+    async def test_listing_refetched_after_ttl(self, mcp_client, mcp_server, monkeypatch):
+        """Test that an expired listing is fetched again."""
+        monkeypatch.setattr(mcp_module, "TOOLS_CACHE_TTL_SECONDS", 0.0)
+        
+        await mcp_client.list_tools()
+        await mcp_client.list_tools()
+        
+        assert mcp_server.requests == 2
+    
+    @pytest.mark.asyncio
+    async def test_failed_listing_not_cached(self, mcp_client, mcp_server):
+        """Test that a failed listing returns no tools and is retried."""
+        mcp_server.status_code = 500
+        assert await mcp_client.list_tools() == []
+        
+        mcp_server.status_code = 200
+        assert await mcp_client.list_tools() == mcp_server.tools
+        assert mcp_server.requests == 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_listings_share_one_request(self, mcp_client, mcp_server):
+        """Test that concurrent callers share a single in-flight request."""
+        first, second = await asyncio.gather(mcp_client.list_tools(), mcp_client.list_tools())
+        
+        assert first == second == mcp_server.tools
+        assert mcp_server.requests == 1
+
+
+class TestToolInputModels:
+    """Test cases for reuse of generated tool input models."""
+    
+    @pytest.mark.asyncio
+    async def test_input_model_shared_across_get_tools(self, mcp_client):
+        """Test that repeated get_tools calls reuse one input model per tool."""
+        first = await mcp_client.get_tools("user_1")
+        second = await mcp_client.get_tools("user_1")
+        
+        assert first[0].args_schema is second[0].args_schema
+    
+    @pytest.mark.asyncio
+    async def test_refreshed_listing_rebuilds_input_model(self, mcp_client, mcp_server, monkeypatch):
+        """Test that a new listing with a changed schema produces a new input model."""
+        first = await mcp_client.get_tools("user_1")
+        
+        monkeypatch.setattr(mcp_module, "TOOLS_CACHE_TTL_SECONDS", 0.0)
+        mcp_server.tools[0]["inputSchema"]["properties"]["duration"] = {
+            "type": "integer", "description": "Duration in minutes"
+        }
+        second = await mcp_client.get_tools("user_1")
+        
+        assert second[0].args_schema is not first[0].args_schema
+        assert "duration" in second[0].args_schema.model_fields
+        assert "duration" not in first[0].args_schema.model_fields
+
+
+class TestCallTool:
+    """Test cases for rendering MCP tool results."""
+    
+    @pytest.mark.asyncio
+    async def test_text_content_returned_as_is(self, mcp_client):
+        """Test that plain text tool content is passed through."""
+        result = await mcp_client.call_tool("log_activity", {"activity": "run"})
+        
+        assert result == "Activity logged"
+    
+    @pytest.mark.asyncio
+    async def test_structured_content_serialized_to_json(self, mcp_client, mcp_server):
+        """Test that structured tool content is returned as JSON text."""
+        mcp_server.tool_content = [{"type": "text", "text": "Chạy bộ 5km 🏃"}, {"distance_km": 5.2}]
+        
+        result = await mcp_client.call_tool("log_activity", {"activity": "run"})
+        
+        assert json.loads(result) == mcp_server.tool_content
+        assert "Chạy bộ 5km 🏃" in result
+    
+    @pytest.mark.asyncio
+    async def test_large_integers_fall_back_to_json(self, mcp_client, mcp_server):
+        """Test that content orjson cannot encode is still serialized."""
+        mcp_server.tool_content = {"total_steps": 2 ** 70}
+        
+        result = await mcp_client.call_tool("log_activity", {"activity": "run"})
+        
+        assert json.loads(result) == {"total_steps": 2 ** 70}
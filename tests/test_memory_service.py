@@ -1,10 +1,8 @@
 """Unit tests for the LangChain memory service."""
 
 import pytest
+import pytest_asyncio
 import asyncio
-import tempfile
-import shutil
-from pathlib import Path
 from datetime import datetime
 
 from services.langchain_memory_service import LangChainMemoryService
@@ -14,14 +12,12 @@ from models.memory import MemoryConfiguration
 class TestLangChainMemoryService:
     """Test cases for LangChain memory service."""
     
-    @pytest.fixture
-    def temp_dir(self):
-        """Create a temporary directory for testing."""
-        temp_dir = tempfile.mkdtemp()
-        yield Path(temp_dir)
-        shutil.rmtree(temp_dir)
+    @pytest.fixture(scope="class")
+    def temp_dir(self, tmp_path_factory):
+        """Create one temporary directory for the whole class."""
+        return tmp_path_factory.mktemp("memory_service")
     
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def memory_config(self):
         """Create a test memory configuration."""
         return MemoryConfiguration(
@@ -33,13 +29,16 @@ class TestLangChainMemoryService:
             memory_storage_backend="file"
         )
     
-    @pytest.fixture
-    def memory_service(self, temp_dir, memory_config):
-        """Create a memory service instance for testing."""
+    @pytest_asyncio.fixture(scope="class")
+    async def memory_service(self, temp_dir, memory_config):
+        """Create one memory service for the class; tests are isolated by reset()."""
         service = LangChainMemoryService(memory_config)
         service.memory_dir = temp_dir / "test_memory"
         service.memory_dir.mkdir(parents=True, exist_ok=True)
-        return service
+        
+        yield service
+        
+        await service.shutdown()
     
     @pytest.mark.asyncio
     async def test_initialization(self, memory_service):
@@ -47,6 +46,9 @@ class TestLangChainMemoryService:
         await memory_service.initialize()
         assert memory_service.config is not None
         assert memory_service.memory_dir.exists()
+        
+        # Stop the periodic cleanup task so it does not outlive the test
+        await memory_service.shutdown()
     
     @pytest.mark.asyncio
     async def test_get_chat_history_for_user(self, memory_service):
@@ -143,6 +145,47 @@ class TestLangChainMemoryService:
         # Verify memory is cleared
         stats_after = await memory_service.get_user_memory_stats(user_id, session_id)
         assert stats_after["has_memory"] is False
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_add_exchange(self, memory_service):
+        """Test that concurrent exchanges on one history file are all stored."""
+        user_id = "test_user"
+        session_id = "test_session"
+        exchange_count = 20
+        
+        await asyncio.gather(*(
+            memory_service.add_exchange(user_id, f"Message {i}", f"Response {i}", session_id)
+            for i in range(exchange_count)
+        ))
+        
+        stats = await memory_service.get_user_memory_stats(user_id, session_id)
+        assert stats["message_count"] == 2 * exchange_count
+    
+    @pytest.mark.asyncio
+    async def test_memory_backend_keeps_history_off_disk(self, temp_dir):
+        """Test that the in-memory backend stores exchanges without touching files."""
+        service = LangChainMemoryService(MemoryConfiguration(memory_storage_backend="memory"))
+        service.memory_dir = temp_dir / "in_memory_backend"
+        service.memory_dir.mkdir(parents=True, exist_ok=True)
+        
+        await service.add_exchange("test_user", "Hello", "Hi there!", "test_session")
+        
+        stats = await service.get_user_memory_stats("test_user", "test_session")
+        assert stats["message_count"] == 2
+        assert stats["memory_type"] == "InMemoryChatMessageHistory"
+        assert list(service.memory_dir.iterdir()) == []
+    
+    @pytest.mark.asyncio
+    async def test_reset(self, memory_service):
+        """Test that reset drops cached histories and stored files."""
+        await memory_service.add_exchange("test_user", "Hello", "Hi there!", "test_session")
+        assert any(memory_service.memory_dir.iterdir())
+        
+        memory_service.reset()
+        
+        assert memory_service.user_memories == {}
+        assert memory_service.memory_dir.exists()
+        assert list(memory_service.memory_dir.iterdir()) == []
 
 
 # Simple test to verify imports work